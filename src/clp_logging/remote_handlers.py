@@ -0,0 +1,806 @@
+import base64
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import as_completed, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import boto3  # type: ignore
+from boto3.s3.transfer import TransferConfig  # type: ignore
+from botocore.config import Config  # type: ignore
+from botocore.exceptions import BotoCoreError, ClientError  # type: ignore
+
+from clp_logging.handlers import CLPFileHandler, CLPLogLevelTimeout
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Module-level binds of the hashing helpers used once per part, skipping the
+# module-attribute lookup on each call.
+_sha256: Callable[..., "hashlib._Hash"] = hashlib.sha256
+_b64encode: Callable[[bytes], bytes] = base64.b64encode
+
+
+# S3 error codes worth retrying; anything else (access denied, a missing
+# upload id) will not succeed on a later attempt either.
+_RETRYABLE_ERROR_CODES: FrozenSet[str] = frozenset(
+    {"SlowDown", "RequestTimeout", "RequestTimeTooSkewed", "InternalError", "ServiceUnavailable"}
+)
+
+
+def _is_retryable(e: Exception) -> bool:
+    """
+    :param e: Exception raised by an `upload_part` call.
+    :return: Whether retrying the part can succeed. `BotoCoreError` and
+        `ConnectionError` are transport-level and always worth retrying;
+        `ClientError` only for S3's transient error codes.
+    """
+    if isinstance(e, ClientError):
+        code: str = e.response.get("Error", {}).get("Code", "")
+        return code in _RETRYABLE_ERROR_CODES
+    return True
+
+
+# S3 limits for multipart uploads
+S3_MIN_PART_SIZE: int = 5 * 1024 * 1024
+S3_MAX_PART_NUM: int = 10000
+
+# Part-count budget used when sizing parts for a large file: staying a little
+# under S3's 10000-part cap leaves room for the file to keep growing after the
+# part size is chosen without immediately forcing an object rollover.
+S3_TARGET_PART_NUM: int = 9500
+
+# Dynamically chosen part sizes are rounded up to a multiple of this.
+PART_SIZE_GRANULARITY: int = 8 * 1024 * 1024
+
+# Default part size. Larger parts amortize the per-request overhead (HTTPS
+# round trip, request signing) over more bytes; S3's 5 MiB minimum caps
+# throughput well below line rate on fast links.
+DEFAULT_PART_SIZE: int = 16 * 1024 * 1024
+
+# Sub-block size used when reading a part: each sub-block is hashed right
+# after it is read, while it is still cache-hot, instead of re-traversing the
+# whole part buffer in a second pass.
+READ_HASH_BLOCK_SIZE: int = 256 * 1024
+
+# Attempts per part before the upload as a whole is given up on. Transient
+# 503/SlowDown responses and connection resets are routine under high
+# parallelism; retrying a single part is much cheaper than aborting and
+# re-uploading everything.
+UPLOAD_PART_MAX_ATTEMPTS: int = 5
+
+
+class _BoundedPartReader:
+    """
+    Read-only file-like view of one part's byte range of a file descriptor.
+
+    Reads go through `os.pread`, which does not use the fd's shared offset, so
+    any number of readers can stream disjoint parts of the same fd
+    concurrently. boto3 accepts any object with `read` as a request body and
+    uses `seek`/`tell` to size and, on retry, rewind it.
+    """
+
+    def __init__(self, fd: int, offset: int, size: int) -> None:
+        """
+        :param fd: File descriptor the range is read from.
+        :param offset: Offset of the range in the file.
+        :param size: Size of the range in bytes.
+        """
+        self._fd: int = fd
+        self._offset: int = offset
+        self._size: int = size
+        self._pos: int = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        :param size: Maximum number of bytes to read; negative reads the rest.
+        :return: Up to `size` bytes of the range, empty at its end.
+        """
+        remaining: int = self._size - self._pos
+        if remaining <= 0:
+            return b""
+        if size < 0 or size > remaining:
+            size = remaining
+        data: bytes = os.pread(self._fd, size, self._offset + self._pos)
+        self._pos += len(data)
+        return data
+
+    def seek(self, pos: int, whence: int = os.SEEK_SET) -> int:
+        """
+        :param pos: Position to seek to, relative to `whence`.
+        :param whence: One of `os.SEEK_SET`, `os.SEEK_CUR`, or `os.SEEK_END`.
+        :return: The new position within the range.
+        :raise ValueError: If `whence` is not a recognized reference point.
+        """
+        if whence == os.SEEK_SET:
+            self._pos = pos
+        elif whence == os.SEEK_CUR:
+            self._pos += pos
+        elif whence == os.SEEK_END:
+            self._pos = self._size + pos
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        return self._pos
+
+    def tell(self) -> int:
+        """
+        :return: The current position within the range.
+        """
+        return self._pos
+
+
+@dataclass
+class _UploadContext:
+    """
+    State of one in-progress multipart upload.
+
+    Bundling the per-upload state and passing it to the part workers (instead
+    of scattering it across handler attributes mutated from multiple threads)
+    keeps the handler itself free of shared-mutable upload state.
+
+    :ivar obj_key: Key of the S3 object currently being uploaded.
+    :ivar upload_id: Id of the in-progress multipart upload.
+    :ivar fd: Shared read-only fd of the log file used for part reads.
+    :ivar part_size: Size of each upload part in bytes.
+    :ivar folder: Remote folder (key prefix) of the upload.
+    :ivar upload_time: Formatted upload timestamp shared by all object names
+        of the upload.
+    :ivar index: Part number the next part will be assigned.
+    :ivar pos: Offset in the log file up to which parts have been planned.
+    :ivar file_count: Number of object rollovers performed so far.
+    :ivar parts: Completed parts in `CompleteMultipartUpload` schema.
+    :ivar lock: Guards `parts` against concurrent upload passes.
+    """
+
+    obj_key: str
+    upload_id: str
+    fd: int
+    part_size: int
+    folder: str
+    upload_time: str
+    index: int = 1
+    pos: int = 0
+    file_count: int = 0
+    parts: List[Dict[str, Any]] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class CLPRemoteHandler(CLPFileHandler):
+    """
+    Handles CLP file upload and comparison to an AWS S3 bucket. Configuration
+    of an AWS access key is required (run `aws configure` in a terminal).
+
+    The log file is uploaded using S3 multipart upload so that a growing log
+    file can be uploaded incrementally: `timeout` uploads any complete parts
+    accumulated so far (e.g. scheduled through `CLPLogLevelTimeout`) and
+    `close` uploads the remaining bytes and completes the upload. Within one
+    upload pass, part uploads are dispatched to a thread pool so their network
+    round trips overlap instead of accumulating serially.
+    """
+
+    def __init__(
+        self,
+        s3_bucket: str,
+        fpath: Path,
+        mode: str = "ab",
+        enable_compression: bool = True,
+        timestamp_format: Optional[str] = None,
+        timezone: Optional[str] = None,
+        loglevel_timeout: Optional[CLPLogLevelTimeout] = None,
+        max_concurrency: int = 8,
+        part_size: int = DEFAULT_PART_SIZE,
+        verify_local_checksum: bool = False,
+    ) -> None:
+        """
+        Constructs a handler that writes the log file locally (see
+        `CLPFileHandler`) and uploads it to the given S3 bucket.
+
+        :param s3_bucket: Name of the S3 bucket the log file is uploaded to.
+        :param fpath: Path to the log file.
+        :param mode: Mode the log file is opened with.
+        :param enable_compression: Use Zstandard compression for the log file.
+        :param timestamp_format: Timestamp format written in preamble to be
+            used when generating the logs with a reader.
+        :param timezone: Timezone in TZID format written in preamble to be used
+            when generating the timestamp from Unix epoch time.
+        :param loglevel_timeout: A `CLPLogLevelTimeout` instance; its
+            `timeout_fn` is extended to also upload the flushed log file (see
+            `timeout`).
+        :param max_concurrency: Maximum number of part uploads in flight at
+            once.
+        :param part_size: Size of each upload part in bytes. Must be at least
+            S3's 5 MiB minimum. Treated as a floor: `initiate_upload` scales
+            the part size up for files large enough to approach S3's
+            10000-part cap at this size.
+        :param verify_local_checksum: Compute each part's SHA256 locally and
+            send it with the part so S3 rejects corrupted uploads. Off by
+            default since S3 already computes a server-side SHA256 for every
+            part (`ChecksumAlgorithm` is set on the upload), making the local
+            hash pass redundant unless end-to-end verification is required.
+        :raise ValueError: If `part_size` is below S3's minimum part size.
+        """
+        if part_size < S3_MIN_PART_SIZE:
+            raise ValueError(f"part_size must be at least {S3_MIN_PART_SIZE} bytes.")
+        if loglevel_timeout:
+            user_timeout_fn: Callable[[], None] = loglevel_timeout.timeout_fn
+
+            def _upload_timeout_fn() -> None:
+                user_timeout_fn()
+                self.timeout()
+
+            loglevel_timeout.timeout_fn = _upload_timeout_fn
+        super().__init__(
+            fpath, mode, enable_compression, timestamp_format, timezone, loglevel_timeout
+        )
+        # Keep enough pooled connections for the part-upload workers and reuse
+        # idle connections between upload passes instead of reconnecting.
+        self._client_config: Config = Config(
+            tcp_keepalive=True,
+            max_pool_connections=max(32, 2 * max_concurrency),
+            retries={"max_attempts": 5, "mode": "adaptive"},
+        )
+        self._s3_client: Optional[Any] = None
+        self.bucket: str = s3_bucket
+        self.log_name: str = fpath.name
+        self.log_path: Path = fpath
+        self.max_concurrency: int = max_concurrency
+        self.part_size: int = part_size
+        self.verify_local_checksum: bool = verify_local_checksum
+        self.obj_key: Optional[str] = None
+        self._upload_ctx: Optional[_UploadContext] = None
+        self._file_size: int = 0
+        # Number of object rollovers in the most recent upload; kept on the
+        # handler (not just the upload context) so compare_files can tell
+        # after completion whether the upload spanned multiple objects.
+        self._rollover_count: int = 0
+        # Pool of reusable part-sized buffers shared by the upload workers so
+        # that steady-state memory stays at O(max_concurrency x part size)
+        # rather than allocating a fresh buffer for every part. Buffers are
+        # allocated lazily by _get_buf: the default upload path streams parts
+        # straight from the fd and never needs one, and the single-threaded
+        # checksum helper needs only one, so eagerly filling the pool would
+        # charge every handler the full worst case up front.
+        self._buf_pool: "Queue[bytearray]" = Queue()
+        self._buf_pool_lock: threading.Lock = threading.Lock()
+        self._buf_pool_alloc: int = 0
+
+    @property
+    def s3_client(self) -> Any:
+        """
+        :return: The S3 client, created on first use so that constructing a
+            handler does not pay for a boto3 session (AWS config parsing and
+            service-model load) before anything is uploaded.
+        """
+        if self._s3_client is None:
+            self._s3_client = boto3.client("s3", config=self._client_config)
+        return self._s3_client
+
+    @property
+    def upload_in_progress(self) -> bool:
+        """
+        :return: Whether a multipart upload is currently in progress.
+        """
+        return self._upload_ctx is not None
+
+    def _remote_log_naming(self, upload_time: str, file_count: int) -> str:
+        """
+        Generates the name of the uploaded log file on S3.
+
+        :param upload_time: Formatted time of the upload, included in the name
+            to distinguish multiple uploads of the same log file. Formatted
+            once per upload so rolled-over objects share the same timestamp
+            and differ only in their count suffix.
+        :param file_count: Number of object rollovers performed so far; names
+            after the first object carry it as a suffix.
+        :return: The generated object name.
+        """
+        count_suffix: str = f"-{file_count}" if file_count else ""
+        ext: str = "".join(Path(self.log_name).suffixes)
+        if ext:
+            return f"log_{upload_time}{count_suffix}{ext}"
+        return f"{upload_time}_{self.log_name}{count_suffix}"
+
+    def _calculate_sha256(self) -> str:
+        """
+        :return: Base64-encoded SHA256 checksum of the whole local log file.
+        """
+        sha256_hash: "hashlib._Hash"
+        with open(self.log_path, "rb") as file:
+            if hasattr(hashlib, "file_digest"):  # python 3.11+
+                # file_digest loops in C, feeding OpenSSL whole buffers at a
+                # time instead of round-tripping small chunks through the
+                # interpreter.
+                sha256_hash = hashlib.file_digest(file, "sha256")
+            else:
+                sha256_hash = _sha256()
+                for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                    sha256_hash.update(chunk)
+        # base64 output is pure ASCII, so the cheaper ASCII decode suffices.
+        return _b64encode(sha256_hash.digest()).decode("ascii")
+
+    def _get_buf(self) -> bytearray:
+        """
+        Takes a part-sized buffer from the pool, allocating one on demand
+        while fewer than `max_concurrency` exist; beyond that, blocks until a
+        buffer is returned. Callers return buffers with `self._buf_pool.put`.
+
+        :return: A buffer of at least `part_size` bytes.
+        """
+        try:
+            return self._buf_pool.get_nowait()
+        except Empty:
+            pass
+        with self._buf_pool_lock:
+            if self._buf_pool_alloc < self.max_concurrency:
+                self._buf_pool_alloc += 1
+                return bytearray(self.part_size)
+        return self._buf_pool.get()
+
+    def _calculate_multipart_sha256(self, part_count: int) -> str:
+        """
+        Computes the checksum S3 reports for a multipart object: the SHA256 of
+        the concatenated per-part SHA256 digests, suffixed with the part count.
+
+        The part boundaries are derived from `part_count` rather than assumed
+        to be uniform: the first `part_count - 1` parts span `part_size` bytes
+        each and the final part spans the rest, which covers both a short tail
+        part and a tail coalesced into the last part.
+
+        :param part_count: Number of parts the object was uploaded in.
+        :return: Base64-encoded composite checksum in S3's `checksum-N` form.
+        """
+        part_digests: bytearray = bytearray()
+        size: int = self.part_size
+        file_size: int = self.log_path.stat().st_size
+        buf: bytearray = self._get_buf()
+        try:
+            view: memoryview = memoryview(buf)
+            with open(self.log_path, "rb") as file:
+                for part in range(part_count):
+                    part_len: int = size if part < part_count - 1 else file_size - part * size
+                    sha256_hash: "hashlib._Hash" = _sha256()
+                    # The final part may exceed the buffer size, so each part
+                    # is hashed in buffer-sized pieces; one C call per piece
+                    # still lets OpenSSL loop over whole buffers natively.
+                    while part_len > 0:
+                        num_read: int = file.readinto(view[: min(part_len, size)])
+                        if not num_read:
+                            break
+                        sha256_hash.update(view[:num_read])
+                        part_len -= num_read
+                    part_digests += sha256_hash.digest()
+        finally:
+            self._buf_pool.put(buf)
+        composite: str = _b64encode(_sha256(bytes(part_digests)).digest()).decode("ascii")
+        return f"{composite}-{part_count}"
+
+    @staticmethod
+    def _plan_parts(index: int, pos: int, size: int, count: int) -> List[Tuple[int, int, int]]:
+        """
+        Plans `count` consecutive part ranges starting at part number `index`
+        and file offset `pos`.
+
+        The whole batch is planned up front as plain tuples so dispatching is
+        a straight loop over precomputed ranges with no per-part state
+        mutation.
+
+        :param index: Part number of the first planned part.
+        :param pos: Offset of the first planned part in the log file.
+        :param size: Size of each part in bytes.
+        :param count: Number of parts to plan.
+        :return: List of `(part_number, offset, size)` tuples.
+        """
+        return [(index + i, pos + i * size, size) for i in range(count)]
+
+    def _upload_part(
+        self, ctx: _UploadContext, part_number: int, offset: int, size: int
+    ) -> Dict[str, Any]:
+        """
+        Uploads one part of the log file to the object currently being
+        uploaded. All upload state is read from `ctx`, so multiple parts can
+        be uploaded concurrently.
+
+        :param ctx: The upload the part belongs to.
+        :param part_number: S3 part number (1-based).
+        :param offset: Offset of the part in the log file.
+        :param size: Size of the part in bytes.
+        :return: The part's entry for `CompleteMultipartUpload`.
+        """
+        body: Any
+        sha256_checksum: Optional[str] = None
+        buf: Optional[bytearray] = None
+        pooled: bool = False
+        try:
+            if self.verify_local_checksum:
+                # Verification needs the bytes locally to hash, so the part
+                # is read into a pooled buffer in sub-blocks, hashing each
+                # one immediately after it is read while it is still
+                # cache-hot. The final part of an upload may have the tail
+                # coalesced into it and exceed the pooled buffer size; such a
+                # part gets a one-off buffer.
+                pooled = size <= ctx.part_size
+                buf = self._get_buf() if pooled else bytearray(size)
+                view: memoryview = memoryview(buf)
+                sha256_hash: "hashlib._Hash" = _sha256()
+                # Bind the loop's attribute lookups to locals; this loop runs
+                # once per 256 KiB sub-block of every part. pread rather than
+                # preadv as the latter does not exist on macOS.
+                pread: Callable[[int, int, int], bytes] = os.pread
+                hash_update: Callable[..., None] = sha256_hash.update
+                fd: int = ctx.fd
+                num_read: int = 0
+                while num_read < size:
+                    block: bytes = pread(
+                        fd, min(READ_HASH_BLOCK_SIZE, size - num_read), offset + num_read
+                    )
+                    if not block:
+                        break
+                    hash_update(block)
+                    view[num_read : num_read + len(block)] = block
+                    num_read += len(block)
+                sha256_checksum = _b64encode(sha256_hash.digest()).decode("ascii")
+                # The buffer is held until the upload finishes so its view
+                # can be the body directly, instead of copying each part into
+                # a fresh bytes. Each worker holds at most one buffer and the
+                # pool's cap equals the worker count, so holding it cannot
+                # starve the pool.
+                body = view[:num_read]
+            else:
+                # Without verification there is no reason to materialize the
+                # part in memory at all: hand urllib3 a bounded file-like
+                # view of the part's byte range and let it stream the body in
+                # its own small chunks, keeping per-in-flight-part memory at
+                # the transport chunk size instead of the part size. S3 still
+                # computes and verifies a SHA256 per part server-side
+                # (ChecksumAlgorithm is set on the upload).
+                body = _BoundedPartReader(ctx.fd, offset, size)
+            upload_args: Dict[str, Any] = {
+                "Bucket": self.bucket,
+                "Key": ctx.obj_key,
+                "Body": body,
+                "PartNumber": part_number,
+                "UploadId": ctx.upload_id,
+            }
+            if sha256_checksum is not None:
+                upload_args["ChecksumSHA256"] = sha256_checksum
+            response: Dict[str, Any] = {}
+            for attempt in range(UPLOAD_PART_MAX_ATTEMPTS):
+                try:
+                    if attempt and isinstance(body, _BoundedPartReader):
+                        body.seek(0)
+                    response = self.s3_client.upload_part(**upload_args)
+                    break
+                except (BotoCoreError, ClientError, ConnectionError) as e:
+                    if attempt == UPLOAD_PART_MAX_ATTEMPTS - 1 or not _is_retryable(e):
+                        raise
+                    # Capped exponential backoff with jitter so retried parts
+                    # do not hit a throttled endpoint in lockstep.
+                    time.sleep(min(2**attempt * 0.1, 5.0) + random.random() * 0.1)
+        finally:
+            if pooled and buf is not None:
+                self._buf_pool.put(buf)
+        # %-style so the message is only formatted when debug logging is on;
+        # this runs once per part on the hot path.
+        logger.debug("Uploaded part %d of %s", part_number, ctx.obj_key)
+        return {
+            "PartNumber": part_number,
+            "ETag": response["ETag"],
+            "ChecksumSHA256": response["ChecksumSHA256"],
+        }
+
+    def _upload_ranges(self, ctx: _UploadContext, ranges: List[Tuple[int, int, int]]) -> None:
+        """
+        Uploads the given part ranges concurrently and collects the results
+        into `ctx.parts` ordered by part number.
+
+        The multipart upload is aborted if any part fails.
+
+        :param ctx: The upload the parts belong to.
+        :param ranges: List of `(part_number, offset, size)` tuples.
+        """
+        # Each completed part is written to its preassigned slot, so results
+        # end up in part order without appending under a lock and re-sorting.
+        results: List[Optional[Dict[str, Any]]] = [None] * len(ranges)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                futures: Dict["Future[Dict[str, Any]]", int] = {
+                    executor.submit(self._upload_part, ctx, part_number, offset, size): slot
+                    for slot, (part_number, offset, size) in enumerate(ranges)
+                }
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+        except Exception:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket, Key=ctx.obj_key, UploadId=ctx.upload_id
+            )
+            self._upload_ctx = None
+            os.close(ctx.fd)
+            raise
+        with ctx.lock:
+            for result in results:
+                assert result is not None
+                ctx.parts.append(result)
+
+    def _rollover_object(self, ctx: _UploadContext) -> None:
+        """
+        Completes the current S3 object and starts a new one.
+
+        S3 caps multipart uploads at `S3_MAX_PART_NUM` parts, so an upload
+        exceeding the cap is split across multiple objects.
+
+        :param ctx: The upload to roll over; its object key, upload id, part
+            number, and parts list are reset for the new object.
+        """
+        self._complete_multipart_upload(ctx)
+        ctx.file_count += 1
+        self._rollover_count += 1
+        ctx.obj_key = f"{ctx.folder}/{self._remote_log_naming(ctx.upload_time, ctx.file_count)}"
+        response: Dict[str, Any] = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket, Key=ctx.obj_key, ChecksumAlgorithm="SHA256"
+        )
+        ctx.upload_id = response["UploadId"]
+        ctx.index = 1
+        ctx.parts = []
+        self.obj_key = ctx.obj_key
+
+    def _complete_multipart_upload(self, ctx: _UploadContext) -> None:
+        """
+        Completes the multipart upload of the object currently being uploaded.
+
+        :param ctx: The upload to complete.
+        """
+        # _upload_part already returns entries in the CompleteMultipartUpload
+        # schema, so the list can be passed through without rebuilding it.
+        ctx.parts.sort(key=lambda part: part["PartNumber"])
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=ctx.obj_key,
+            UploadId=ctx.upload_id,
+            MultipartUpload={"Parts": ctx.parts},
+        )
+
+    def _transfer_upload(self) -> None:
+        """
+        Uploads the finalized log file in one shot through boto3's managed
+        transfer (`upload_file`), which brings its own part concurrency,
+        buffering, and retry handling. Used from `close` when no incremental
+        multipart upload was started beforehand, where the hand-rolled part
+        loop has no advantage.
+        """
+        timestamp: datetime = datetime.now()
+        folder: str = f"logs/{timestamp.year}/{timestamp.month}/{timestamp.day}"
+        upload_time: str = timestamp.strftime("%Y-%m-%d-%H%M%S")
+        self.obj_key = f"{folder}/{self._remote_log_naming(upload_time, 0)}"
+        self.s3_client.upload_file(
+            Filename=str(self.log_path),
+            Bucket=self.bucket,
+            Key=self.obj_key,
+            Config=TransferConfig(
+                multipart_chunksize=self.part_size,
+                max_concurrency=self.max_concurrency,
+                use_threads=True,
+            ),
+            ExtraArgs={"ChecksumAlgorithm": "SHA256"},
+        )
+        logger.debug("Uploaded %s through managed transfer", self.obj_key)
+
+    def refresh_file_size(self) -> int:
+        """
+        Re-stats the log file and updates the cached file size.
+
+        Needed while the log file is still being appended to; a finished file
+        can rely on the size cached by the last refresh.
+
+        :return: The current size of the log file in bytes.
+        """
+        self._file_size = self.log_path.stat().st_size
+        return self._file_size
+
+    def initiate_upload(self) -> None:
+        """
+        Starts a multipart upload of the log file to the S3 bucket.
+
+        :raise RuntimeError: If an upload is already in progress.
+        """
+        if self._upload_ctx is not None:
+            raise RuntimeError("An upload is already in progress.")
+        self.refresh_file_size()
+        # Scale the part size up when the file is already large enough that
+        # the configured size would approach S3's 10000-part cap: fewer,
+        # larger parts mean fewer requests and keep the object-rollover path
+        # out of the common case. The configured size acts as a floor, so
+        # small (or still-empty, still-growing) files are unaffected.
+        if self._file_size > self.part_size * S3_TARGET_PART_NUM:
+            scaled_size: int = -(-self._file_size // S3_TARGET_PART_NUM)
+            scaled_size = -(-scaled_size // PART_SIZE_GRANULARITY) * PART_SIZE_GRANULARITY
+            self.part_size = scaled_size
+            # Any buffers pooled so far were sized for the smaller part size;
+            # reset the pool so _get_buf re-allocates at the new size.
+            self._buf_pool = Queue()
+            self._buf_pool_alloc = 0
+        timestamp: datetime = datetime.now()
+        # Format the timestamp once per upload; rollover reuses it so all
+        # objects of one upload share a name and differ only in count suffix.
+        upload_time: str = timestamp.strftime("%Y-%m-%d-%H%M%S")
+        folder: str = f"logs/{timestamp.year}/{timestamp.month}/{timestamp.day}"
+        obj_key: str = f"{folder}/{self._remote_log_naming(upload_time, 0)}"
+        response: Dict[str, Any] = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket, Key=obj_key, ChecksumAlgorithm="SHA256"
+        )
+        # One shared read-only fd for all part reads; workers read through it
+        # with pread instead of reopening the log file for every part.
+        self._upload_ctx = _UploadContext(
+            obj_key=obj_key,
+            upload_id=response["UploadId"],
+            fd=os.open(str(self.log_path), os.O_RDONLY),
+            part_size=self.part_size,
+            folder=folder,
+            upload_time=upload_time,
+        )
+        self.obj_key = obj_key
+        self._rollover_count = 0
+        logger.debug("Initiated multipart upload to %s", obj_key)
+
+    def multipart_upload(self, final: bool = False) -> None:
+        """
+        Uploads all complete parts that have accumulated in the log file since
+        the last call. Part uploads are submitted to a thread pool so multiple
+        part PUTs are in flight at once.
+
+        On an intermediate pass, incomplete trailing bytes are left for a
+        later call. On the final pass, the tail is coalesced into the last
+        full part (S3 allows only the final part to exceed the part size, up
+        to 5 GiB) so that it does not cost a separate request; a tail with no
+        full part to join is uploaded as its own short final part.
+
+        :param final: Whether this is the last pass before `complete_upload`.
+        :raise RuntimeError: If no upload is in progress.
+        """
+        ctx: Optional[_UploadContext] = self._upload_ctx
+        if ctx is None:
+            raise RuntimeError("No upload in progress.")
+        # The log file may still be growing between calls, so the size is
+        # refreshed once per pass rather than cached from initiate_upload.
+        file_size: int = self.refresh_file_size()
+        size: int = ctx.part_size
+        remaining_parts: int = (file_size - ctx.pos) // size
+        while remaining_parts > 0:
+            if ctx.index > S3_MAX_PART_NUM:
+                self._rollover_object(ctx)
+            # The part-limit math is hoisted out of the planning loop: one
+            # batch covers as many of the remaining full parts as fit in the
+            # current object, so planning is a straight range comprehension
+            # with no per-part limit checks, and the rollover branch runs at
+            # most once per S3_MAX_PART_NUM parts.
+            batch_len: int = min(remaining_parts, S3_MAX_PART_NUM - ctx.index + 1)
+            ranges: List[Tuple[int, int, int]] = self._plan_parts(
+                ctx.index, ctx.pos, size, batch_len
+            )
+            ctx.index += batch_len
+            ctx.pos += batch_len * size
+            if final and remaining_parts == batch_len and file_size - ctx.pos > 0:
+                # Absorb the tail into the last planned part.
+                part_number, offset, part_size = ranges[-1]
+                ranges[-1] = (part_number, offset, part_size + file_size - ctx.pos)
+                ctx.pos = file_size
+            self._upload_ranges(ctx, ranges)
+            remaining_parts -= batch_len
+        if final and file_size - ctx.pos > 0:
+            # The tail is subject to the same part-number cap as full parts:
+            # prior passes may have left the current object exactly full.
+            if ctx.index > S3_MAX_PART_NUM:
+                self._rollover_object(ctx)
+            # Route the tail through _upload_ranges too, so a tail failure
+            # gets the same abort-and-cleanup handling as any other part.
+            tail: List[Tuple[int, int, int]] = [(ctx.index, ctx.pos, file_size - ctx.pos)]
+            ctx.index += 1
+            ctx.pos = file_size
+            self._upload_ranges(ctx, tail)
+
+    def complete_upload(self, verify: bool = False) -> None:
+        """
+        Completes the multipart upload.
+
+        Any bytes not yet uploaded are handled by a final `multipart_upload`
+        pass first, which folds the tail into the last part instead of
+        spending a request on it.
+
+        :param verify: Issue a `head_object` request for the completed object
+            and log its metadata. Off by default as it adds a full round trip
+            to every upload.
+        :raise RuntimeError: If no upload is in progress.
+        """
+        ctx: Optional[_UploadContext] = self._upload_ctx
+        if ctx is None:
+            raise RuntimeError("No upload in progress.")
+        # Always run a final pass: it re-stats the file, so bytes appended
+        # after the last intermediate pass are still picked up.
+        self.multipart_upload(final=True)
+        self._complete_multipart_upload(ctx)
+        if verify:
+            response: Dict[str, Any] = self.s3_client.head_object(
+                Bucket=self.bucket, Key=ctx.obj_key
+            )
+            logger.debug("Completed upload of %s: %s", ctx.obj_key, response)
+        self._upload_ctx = None
+        os.close(ctx.fd)
+
+    def compare_files(self) -> bool:
+        """
+        Compares the uploaded object against the local log file by checksum.
+
+        The object key is known from the upload, so the object is headed
+        directly rather than listing the remote folder, and the local checksum
+        is computed exactly once.
+
+        Only single-object uploads can be compared: after a rollover (an
+        upload exceeding S3's 10000-part cap), the log file is split across
+        multiple objects and `obj_key` names only the last one, which covers
+        just a byte range of the local file.
+
+        :return: Whether the checksum S3 reports for the uploaded object
+            matches the one computed from the local log file.
+        :raise RuntimeError: If nothing has been uploaded yet, or the upload
+            rolled over to multiple objects.
+        """
+        if self.obj_key is None:
+            raise RuntimeError("No uploaded object to compare against.")
+        if self._rollover_count:
+            raise RuntimeError(
+                "The upload rolled over to multiple objects; only single-object uploads can be"
+                " compared against the local log file."
+            )
+        try:
+            response: Dict[str, Any] = self.s3_client.head_object(
+                Bucket=self.bucket, Key=self.obj_key, ChecksumMode="ENABLED"
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        remote_checksum: Optional[str] = response.get("ChecksumSHA256")
+        if remote_checksum is None:
+            return False
+        # Multipart objects report a composite checksum-of-checksums with a
+        # part-count suffix; single-part objects report a plain SHA256.
+        local_checksum: str = (
+            self._calculate_multipart_sha256(int(remote_checksum.rsplit("-", 1)[1]))
+            if "-" in remote_checksum
+            else self._calculate_sha256()
+        )
+        return remote_checksum == local_checksum
+
+    def timeout(self) -> None:
+        """
+        Uploads all complete parts accumulated in the log file so far.
+
+        Suitable for use from the `timeout_fn` of a `CLPLogLevelTimeout`; the
+        constructor wires this up automatically when `loglevel_timeout` is
+        provided.
+        """
+        if self._upload_ctx is None:
+            self.initiate_upload()
+        self.multipart_upload()
+
+    # override
+    def close(self) -> None:
+        """
+        Closes the stream (see `CLPFileHandler`) and uploads the finalized log
+        file to the S3 bucket.
+        """
+        super().close()
+        if self._upload_ctx is None:
+            if self.log_path.stat().st_size == 0:
+                return
+            # No parts were uploaded while the log was being written, so the
+            # whole file can go through boto3's managed transfer instead of
+            # the incremental part loop.
+            self._transfer_upload()
+            return
+        self.complete_upload()
@@ -6,6 +6,7 @@ from tests.test_handlers import (
     TestClpKeyValuePairLoggingBase,
     TestCLPSegmentStreamingBase,
 )
+from tests.test_remote_handlers import TestCLPRemoteBase
 
 
 def add_tests(suite: unittest.TestSuite, loader: unittest.TestLoader, test_class: type) -> None:
@@ -42,4 +43,7 @@ def load_tests(
     for kv_pair_handler_test_class in TestClpKeyValuePairLoggingBase.__subclasses__():
         add_tests(suite, loader, kv_pair_handler_test_class)
 
+    for remote_test_class in TestCLPRemoteBase.__subclasses__():
+        add_tests(suite, loader, remote_test_class)
+
     return suite
@@ -0,0 +1,341 @@
+import base64
+import hashlib
+import os
+import unittest
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from clp_logging.handlers import CLPFileHandler
+
+try:
+    from botocore.exceptions import BotoCoreError, ClientError  # type: ignore
+
+    from clp_logging.remote_handlers import (
+        _BoundedPartReader,
+        _is_retryable,
+        _UploadContext,
+        CLPRemoteHandler,
+        S3_MIN_PART_SIZE,
+    )
+
+    AWS_EXTRA_INSTALLED: bool = True
+except ImportError:
+    # boto3 is the optional aws extra; without it the remote-handler tests
+    # are skipped (see TestCLPRemoteBase).
+    AWS_EXTRA_INSTALLED = False
+
+LOG_DIR: Path = Path("unittest-logs")
+
+
+class MockS3Client:
+    """
+    Minimal stand-in for the boto3 S3 client that records upload traffic.
+
+    `upload_part` drains the request body so streamed (`_BoundedPartReader`)
+    and materialized (`bytes`) bodies are exercised the same way.
+    """
+
+    def __init__(self, fail_upload_part: bool = False) -> None:
+        self.fail_upload_part: bool = fail_upload_part
+        self.upload_part_calls: List[Dict[str, Any]] = []
+        self.complete_calls: List[Dict[str, Any]] = []
+        self.abort_calls: List[Dict[str, Any]] = []
+
+    def create_multipart_upload(self, **kwargs: Any) -> Dict[str, Any]:
+        return {"UploadId": "test-upload-id"}
+
+    def upload_part(self, **kwargs: Any) -> Dict[str, Any]:
+        if self.fail_upload_part:
+            raise ClientError({"Error": {"Code": "AccessDenied"}}, "UploadPart")
+        body: Any = kwargs["Body"]
+        data: bytes
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            data = bytes(body)
+        else:
+            data = body.read()
+        part_number: int = kwargs["PartNumber"]
+        self.upload_part_calls.append(
+            {
+                "PartNumber": part_number,
+                "Size": len(data),
+                "Sha256": base64.b64encode(hashlib.sha256(data).digest()).decode("ascii"),
+                "ChecksumSHA256": kwargs.get("ChecksumSHA256"),
+            }
+        )
+        return {"ETag": f"etag-{part_number}", "ChecksumSHA256": f"checksum-{part_number}"}
+
+    def complete_multipart_upload(self, **kwargs: Any) -> Dict[str, Any]:
+        self.complete_calls.append(kwargs)
+        return {}
+
+    def abort_multipart_upload(self, **kwargs: Any) -> Dict[str, Any]:
+        self.abort_calls.append(kwargs)
+        return {}
+
+
+class TestCLPRemoteBase(unittest.TestCase):
+    """
+    Functionally abstract base class for the remote-handler tests; see
+    `TestCLPBase` for why it cannot be made properly abstract.
+
+    All subclasses' tests are skipped when the optional aws extra (boto3) is
+    not installed, so the suite degrades cleanly without it.
+    """
+
+    # override
+    @classmethod
+    def setUpClass(cls) -> None:
+        if not AWS_EXTRA_INSTALLED:
+            raise unittest.SkipTest("requires the aws extra (boto3)")
+        if not LOG_DIR.exists():
+            LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+
+class TestBoundedPartReader(TestCLPRemoteBase):
+    """
+    Test `_BoundedPartReader` against a real fd.
+    """
+
+    content: bytes = bytes(range(256)) * 4
+
+    # override
+    def setUp(self) -> None:
+        self.path: Path = LOG_DIR / Path(f"{self.id()}.bin")
+        self.path.write_bytes(self.content)
+        self.fd: int = os.open(str(self.path), os.O_RDONLY)
+
+    # override
+    def tearDown(self) -> None:
+        os.close(self.fd)
+        self.path.unlink()
+
+    def test_read_bounded_range(self) -> None:
+        reader: _BoundedPartReader = _BoundedPartReader(self.fd, 100, 300)
+        self.assertEqual(reader.read(), self.content[100:400])
+        self.assertEqual(reader.read(), b"")
+        self.assertEqual(reader.tell(), 300)
+
+    def test_read_in_chunks(self) -> None:
+        reader: _BoundedPartReader = _BoundedPartReader(self.fd, 10, 25)
+        data: bytes = b"".join(iter(lambda: reader.read(7), b""))
+        self.assertEqual(data, self.content[10:35])
+
+    def test_seek_and_tell(self) -> None:
+        reader: _BoundedPartReader = _BoundedPartReader(self.fd, 0, 64)
+        self.assertEqual(reader.seek(0, os.SEEK_END), 64)
+        self.assertEqual(reader.seek(-4, os.SEEK_CUR), 60)
+        self.assertEqual(reader.read(), self.content[60:64])
+        self.assertEqual(reader.seek(0), 0)
+        self.assertEqual(reader.read(), self.content[:64])
+        with self.assertRaises(ValueError):
+            reader.seek(0, 3)
+
+
+class TestRetryPolicy(TestCLPRemoteBase):
+    """
+    Test `_is_retryable`'s classification of part-upload errors.
+    """
+
+    def test_transport_errors_are_retryable(self) -> None:
+        self.assertTrue(_is_retryable(BotoCoreError()))
+        self.assertTrue(_is_retryable(ConnectionError()))
+
+    def test_transient_client_errors_are_retryable(self) -> None:
+        for code in ("SlowDown", "RequestTimeout", "InternalError", "ServiceUnavailable"):
+            error: ClientError = ClientError({"Error": {"Code": code}}, "UploadPart")
+            self.assertTrue(_is_retryable(error), code)
+
+    def test_permanent_client_errors_are_not_retryable(self) -> None:
+        for code in ("AccessDenied", "NoSuchUpload", "InvalidPart"):
+            error: ClientError = ClientError({"Error": {"Code": code}}, "UploadPart")
+            self.assertFalse(_is_retryable(error), code)
+
+
+class TestCLPRemoteHandlerBase(TestCLPRemoteBase):
+    """
+    Base class owning a `CLPRemoteHandler` whose S3 client is a `MockS3Client`.
+
+    The handler writes its (compressed) log stream normally; tests append raw
+    bytes straight to the log file instead, as the upload path only cares
+    about sizes and offsets, never content.
+    """
+
+    # override
+    def setUp(self) -> None:
+        self.log_path: Path = LOG_DIR / Path(f"{self.id()}.clp.zst")
+        if self.log_path.exists():
+            self.log_path.unlink()
+        self.handler: CLPRemoteHandler = CLPRemoteHandler(
+            "test-bucket", self.log_path, part_size=S3_MIN_PART_SIZE
+        )
+        self.mock_client: MockS3Client = MockS3Client()
+        self.handler._s3_client = self.mock_client
+
+    # override
+    def tearDown(self) -> None:
+        ctx: Optional[Any] = self.handler._upload_ctx
+        if ctx is not None:
+            os.close(ctx.fd)
+            self.handler._upload_ctx = None
+        # Close only the local stream; CLPRemoteHandler.close would upload.
+        CLPFileHandler.close(self.handler)
+        self.log_path.unlink()
+
+    def append_to_log(self, num_bytes: int) -> None:
+        with open(self.log_path, "ab") as f:
+            f.write(b"x" * num_bytes)
+
+    def uploaded_sizes(self) -> List[int]:
+        # Ordered by part number: parts upload concurrently, so the recorded
+        # call order is nondeterministic.
+        calls: List[Dict[str, Any]] = sorted(
+            self.mock_client.upload_part_calls, key=lambda call: call["PartNumber"]
+        )
+        return [call["Size"] for call in calls]
+
+
+class TestCLPRemoteHandler(TestCLPRemoteHandlerBase):
+    """
+    Test the upload planning, naming, and failure handling of
+    `CLPRemoteHandler` without AWS access.
+    """
+
+    def test_part_size_below_minimum_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            CLPRemoteHandler("test-bucket", self.log_path, part_size=S3_MIN_PART_SIZE - 1)
+
+    def test_plan_parts(self) -> None:
+        plan: List[Tuple[int, int, int]] = CLPRemoteHandler._plan_parts(3, 200, 100, 4)
+        self.assertEqual(plan, [(3, 200, 100), (4, 300, 100), (5, 400, 100), (6, 500, 100)])
+        self.assertEqual(CLPRemoteHandler._plan_parts(1, 0, 100, 0), [])
+
+    def _naming_handler(self, log_name: str) -> "CLPRemoteHandler":
+        # A dedicated handler: the shared one's log name contains the dotted
+        # test id, which Path.suffixes would treat as one long extension.
+        return CLPRemoteHandler("test-bucket", LOG_DIR / Path(log_name))
+
+    def test_remote_log_naming(self) -> None:
+        handler: CLPRemoteHandler = self._naming_handler("example.clp.zst")
+        try:
+            upload_time: str = "2024-01-02-030405"
+            self.assertEqual(
+                handler._remote_log_naming(upload_time, 0),
+                f"log_{upload_time}.clp.zst",
+            )
+            self.assertEqual(
+                handler._remote_log_naming(upload_time, 2),
+                f"log_{upload_time}-2.clp.zst",
+            )
+        finally:
+            CLPFileHandler.close(handler)
+            handler.log_path.unlink()
+
+    def test_remote_log_naming_without_extension(self) -> None:
+        handler: CLPRemoteHandler = self._naming_handler("example-noext")
+        try:
+            upload_time: str = "2024-01-02-030405"
+            self.assertEqual(
+                handler._remote_log_naming(upload_time, 0),
+                f"{upload_time}_example-noext",
+            )
+            self.assertEqual(
+                handler._remote_log_naming(upload_time, 1),
+                f"{upload_time}_example-noext-1",
+            )
+        finally:
+            CLPFileHandler.close(handler)
+            handler.log_path.unlink()
+
+    def test_small_file_uploaded_as_single_tail_part(self) -> None:
+        self.append_to_log(1024)
+        self.handler.initiate_upload()
+        self.handler.complete_upload()
+        self.assertEqual(self.uploaded_sizes(), [1024])
+        self.assertEqual(len(self.mock_client.complete_calls), 1)
+        self.assertIsNone(self.handler._upload_ctx)
+
+    def test_tail_coalesced_into_last_part(self) -> None:
+        self.append_to_log(2 * S3_MIN_PART_SIZE + 1024)
+        self.handler.initiate_upload()
+        self.handler.complete_upload()
+        # The 1024 B tail rides along with the second part instead of
+        # costing its own request.
+        self.assertEqual(self.uploaded_sizes(), [S3_MIN_PART_SIZE, S3_MIN_PART_SIZE + 1024])
+
+    def test_incremental_pass_leaves_tail_for_completion(self) -> None:
+        self.append_to_log(S3_MIN_PART_SIZE + 10)
+        self.handler.initiate_upload()
+        self.handler.multipart_upload()
+        self.assertEqual(self.uploaded_sizes(), [S3_MIN_PART_SIZE])
+        # Bytes appended between the incremental pass and completion must
+        # still be picked up.
+        self.append_to_log(100)
+        self.handler.complete_upload()
+        self.assertEqual(self.uploaded_sizes(), [S3_MIN_PART_SIZE, 110])
+        parts: List[Dict[str, Any]] = self.mock_client.complete_calls[0]["MultipartUpload"]["Parts"]
+        self.assertEqual([part["PartNumber"] for part in parts], [1, 2])
+
+    def test_failed_part_aborts_upload_and_closes_fd(self) -> None:
+        self.append_to_log(1024)
+        self.handler.initiate_upload()
+        self.mock_client.fail_upload_part = True
+        ctx: Optional[_UploadContext] = self.handler._upload_ctx
+        assert ctx is not None
+        fd: int = ctx.fd
+        with self.assertRaises(ClientError):
+            self.handler.complete_upload()
+        self.assertEqual(len(self.mock_client.abort_calls), 1)
+        self.assertIsNone(self.handler._upload_ctx)
+        with self.assertRaises(OSError):
+            os.fstat(fd)
+
+    def test_verify_local_checksum_sends_matching_part_checksum(self) -> None:
+        self.handler.verify_local_checksum = True
+        self.append_to_log(S3_MIN_PART_SIZE + 1024)
+        self.handler.initiate_upload()
+        self.handler.complete_upload()
+        self.assertEqual(self.uploaded_sizes(), [S3_MIN_PART_SIZE + 1024])
+        call: Dict[str, Any] = self.mock_client.upload_part_calls[0]
+        self.assertEqual(call["ChecksumSHA256"], call["Sha256"])
+
+    def test_compare_files_rejected_after_rollover(self) -> None:
+        self.handler.obj_key = "logs/2024/1/1/log_2024-01-02-030405-1.clp.zst"
+        self.handler._rollover_count = 1
+        with self.assertRaises(RuntimeError):
+            self.handler.compare_files()
+
+    def test_initiate_twice_rejected(self) -> None:
+        self.handler.initiate_upload()
+        with self.assertRaises(RuntimeError):
+            self.handler.initiate_upload()
+
+    def test_multipart_sha256_uniform_parts(self) -> None:
+        # 2 full parts and a short third part
+        self.append_to_log(2 * S3_MIN_PART_SIZE + 1024)
+        self.assertEqual(
+            self.handler._calculate_multipart_sha256(3),
+            self._expected_composite([S3_MIN_PART_SIZE, S3_MIN_PART_SIZE, 1024]),
+        )
+
+    def test_multipart_sha256_coalesced_tail(self) -> None:
+        # Same bytes uploaded as 2 parts: the tail coalesced into the second
+        self.append_to_log(2 * S3_MIN_PART_SIZE + 1024)
+        self.assertEqual(
+            self.handler._calculate_multipart_sha256(2),
+            self._expected_composite([S3_MIN_PART_SIZE, S3_MIN_PART_SIZE + 1024]),
+        )
+
+    def _expected_composite(self, part_lens: List[int]) -> str:
+        data: bytes = self.log_path.read_bytes()
+        self.assertEqual(len(data), sum(part_lens))
+        digests: bytes = b""
+        pos: int = 0
+        for part_len in part_lens:
+            digests += hashlib.sha256(data[pos : pos + part_len]).digest()
+            pos += part_len
+        composite: str = base64.b64encode(hashlib.sha256(digests).digest()).decode("ascii")
+        return f"{composite}-{len(part_lens)}"
+
+
+if __name__ == "__main__":
+    unittest.main()